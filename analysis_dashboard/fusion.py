@@ -1,15 +1,29 @@
 import requests
 import os
 import sqlite3
+import time
+import hashlib
+import pyarrow as pa
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from migrate_epoch_timestamps import migrate as migrate_timestamps
 
 # Service URLs
 PRICE_SERVICE_URL = os.getenv("PRICE_SERVICE_URL", "http://price-service:8001/prices")
 FUNDAMENTAL_SERVICE_URL = os.getenv("FUNDAMENTAL_SERVICE_URL", "http://fundamental-service:8002/marketcap")
 DB_PATH = "/app/data/analysis_cache.db"
 
+# Module-level session so upstream calls reuse keep-alive connections
+# instead of paying TCP setup per request; pool sized for the bulk
+# fetch fan-out
+SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 
 # ---------------------------------------------------------
 # Database Context Manager
@@ -38,33 +52,51 @@ def init_db():
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Market cap history
+        # Market cap history - timestamp is unix epoch seconds (INTEGER), so
+        # index comparisons are integer compares instead of strcmp on ISO text
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS market_cap_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 symbol TEXT NOT NULL,
                 market_cap INTEGER NOT NULL,
-                timestamp TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
                 UNIQUE(symbol, timestamp)
             )
         """)
-        
+
+    # Upgrade path for databases created before the epoch-second schema:
+    # rebuilds the table with an INTEGER timestamp column. Idempotent and
+    # a no-op once converted. Runs before index creation because the
+    # rebuild drops the old table along with any indexes on it. A failed
+    # migration must not stop the service from booting - the readers
+    # tolerate unconverted rows, just more slowly.
+    try:
+        migrate_timestamps()
+    except Exception as e:
+        print(f"⚠️ Timestamp migration failed (continuing with existing data): {e}")
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
         # Index
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_mcap_symbol ON market_cap_history(symbol, timestamp DESC)")
-    
+
+        # Covering index so history reads are index-only scans (no heap fetch per row)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_mcap_cover ON market_cap_history(symbol, timestamp DESC, market_cap)")
+
     print("✅ Analysis database initialized")
 
 
 # ---------------------------------------------------------
 # Database Operations
 # ---------------------------------------------------------
-def save_market_cap_to_db(symbol: str, market_cap: int, timestamp: Optional[str] = None):
-    """Save market cap to database"""
+def save_market_cap_to_db(symbol: str, market_cap: int, timestamp: Optional[int] = None):
+    """Save market cap to database (timestamp is unix epoch seconds)"""
     if market_cap is None:
         return
-    
-    timestamp = timestamp or datetime.now(timezone.utc).isoformat()
-    
+
+    timestamp = timestamp or int(time.time())
+
     with get_db_connection() as conn:
         conn.execute(
             "INSERT OR REPLACE INTO market_cap_history (symbol, market_cap, timestamp) VALUES (?, ?, ?)",
@@ -72,16 +104,60 @@ def save_market_cap_to_db(symbol: str, market_cap: int, timestamp: Optional[str]
         )
 
 
-def get_market_cap_history(symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
-    """Get market cap history from database"""
+def _market_cap_rows(symbol: str, limit: int) -> List[tuple]:
+    """Fetch (market_cap, epoch_seconds) rows, oldest first"""
     with get_db_connection() as conn:
         cursor = conn.execute(
-            "SELECT market_cap, timestamp FROM market_cap_history WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?",
+            """
+            SELECT market_cap, timestamp FROM (
+                SELECT market_cap, timestamp FROM market_cap_history
+                WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?
+            ) ORDER BY timestamp ASC
+            """,
             (symbol, limit)
         )
-        rows = cursor.fetchall()
-    
-    return [{"market_cap": row[0], "timestamp": row[1]} for row in reversed(rows)]
+        return cursor.fetchall()
+
+
+def get_market_cap_history(symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+    """Get market cap history from database"""
+    # Convert epoch seconds back to ISO-8601 only at the JSON boundary.
+    # int() tolerates epoch digits a legacy TEXT-affinity column stored
+    # as text (e.g. when the migration has not run yet).
+    return [
+        {
+            "market_cap": row[0],
+            "timestamp": datetime.fromtimestamp(int(row[1]), timezone.utc).isoformat()
+        }
+        for row in _market_cap_rows(symbol, limit)
+    ]
+
+
+def get_market_cap_history_arrow(symbol: str, limit: int = 100,
+                                 if_none_match: Optional[str] = None):
+    """Market cap history as an Arrow IPC (Feather V2) buffer.
+
+    Timestamps go over the wire as typed timestamp[s, UTC] columns, so
+    clients load a ready DataFrame with zero JSON parsing and no string
+    timestamp parsing.
+
+    Returns (etag, payload). The etag is a content hash of the rows;
+    when it matches if_none_match the payload is None, so callers can
+    answer 304 without serializing anything.
+    """
+    rows = _market_cap_rows(symbol, limit)
+    etag = '"%s"' % hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+    if if_none_match == etag:
+        return etag, None
+
+    table = pa.table({
+        "timestamp": pa.array((int(row[1]) for row in rows), type=pa.timestamp("s", tz="UTC")),
+        "market_cap": pa.array((row[0] for row in rows), type=pa.int64()),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return etag, sink.getvalue().to_pybytes()
 
 
 # ---------------------------------------------------------
@@ -90,7 +166,7 @@ def get_market_cap_history(symbol: str, limit: int = 100) -> List[Dict[str, Any]
 def fetch_from_service(url: str, error_context: str) -> Optional[Dict[str, Any]]:
     """Generic HTTP GET with error handling"""
     try:
-        response = requests.get(url, timeout=5)
+        response = SESSION.get(url, timeout=5)
         if response.status_code == 200:
             return response.json()
         else:
@@ -107,12 +183,12 @@ def fetch_from_service(url: str, error_context: str) -> Optional[Dict[str, Any]]
 def get_fused_data(symbol: str) -> Dict[str, Any]:
     """Get fused data - price and market cap"""
     symbol = symbol.upper()
-    timestamp = datetime.now(timezone.utc).isoformat()
+    timestamp = int(time.time())
     errors = []
     
-    # Fetch price data
+    # Fetch price data - project down to the fields fused consumers read
     price_data = fetch_from_service(
-        f"{PRICE_SERVICE_URL}/{symbol}",
+        f"{PRICE_SERVICE_URL}/{symbol}?fields=timestamp_local,open,high,low,close,volume",
         f"Price error for {symbol}"
     )
     if not price_data:
@@ -150,5 +226,33 @@ def get_fused_data(symbol: str) -> Dict[str, Any]:
     }
 
 
+def get_dashboard_data(symbol: str, limit: int = 100) -> Dict[str, Any]:
+    """One-call bundle for the dashboard: fused data plus market-cap history.
+
+    Superset of the /fused/{symbol} payload, so clients can treat it as a
+    drop-in replacement and save the extra history round-trip.
+    """
+    symbol = symbol.upper()
+    bundle = get_fused_data(symbol)
+    bundle["marketcap_history"] = get_market_cap_history(symbol, limit)
+    return bundle
+
+
+def get_fused_bulk(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Get fused data for several symbols in one call.
+
+    The upstream price/fundamental fetches run concurrently so the bulk
+    response takes roughly one round-trip instead of one per symbol.
+    """
+    symbols = [s.upper() for s in symbols if s]
+    if not symbols:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(len(symbols), 8)) as executor:
+        results = executor.map(get_fused_data, symbols)
+
+    return dict(zip(symbols, results))
+
+
 # Initialize database on import
 init_db()
\ No newline at end of file
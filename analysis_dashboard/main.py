@@ -1,5 +1,5 @@
-from fastapi import FastAPI
-from fusion import get_fused_data, get_market_cap_history
+from fastapi import FastAPI, Request, Response
+from fusion import get_dashboard_data, get_fused_bulk, get_market_cap_history, get_market_cap_history_arrow
 
 app = FastAPI(title="Analysis & Fusion Service")
 
@@ -7,14 +7,37 @@ app = FastAPI(title="Analysis & Fusion Service")
 def root():
     return {"message": "Analysis Service - use /fused/{symbol}"}
 
+@app.get("/fused")
+def fused_bulk(symbols: str):
+    """Get fused data for a comma-separated list of symbols in one request"""
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
+    return {"count": len(symbol_list), "data": get_fused_bulk(symbol_list)}
+
 @app.get("/fused/{symbol}")
 def fused(symbol: str):
     """Get fused data (price + market cap)"""
-    return get_fused_data(symbol)
+    return get_fused_bulk([symbol]).get(symbol.upper())
+
+@app.get("/dashboard/{symbol}")
+def dashboard(symbol: str, limit: int = 100):
+    """Get fused data and market-cap history in a single response"""
+    return get_dashboard_data(symbol, limit)
 
 @app.get("/marketcap/history/{symbol}")
-def marketcap_history(symbol: str, limit: int = 100):
-    """Get market cap history for a symbol"""
+def marketcap_history(symbol: str, request: Request, limit: int = 100, fmt: str = "json"):
+    """Get market cap history for a symbol (fmt=arrow for an Arrow IPC buffer)"""
+    if fmt == "arrow":
+        etag, payload = get_market_cap_history_arrow(
+            symbol.upper(), limit, request.headers.get("if-none-match")
+        )
+        if payload is None:
+            # Unchanged since the client's copy - skip the body entirely
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(
+            content=payload,
+            media_type="application/vnd.apache.arrow.file",
+            headers={"ETag": etag}
+        )
     return {
         "symbol": symbol.upper(),
         "history": get_market_cap_history(symbol.upper(), limit)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Migration script to convert TEXT ISO-8601 timestamps to INTEGER unix epoch.
+
+Runs automatically from init_db() on startup; it is idempotent and a
+no-op once a database has been converted.
+
+The legacy tables declared `timestamp TEXT`, and SQLite column affinity
+means an in-place UPDATE would coerce bound ints right back to text -
+so the migration rebuilds each table with an INTEGER column and copies
+the rows across with the conversion applied.
+"""
+
+import sqlite3
+import os
+from datetime import datetime, timezone
+
+DB_PATH = "/app/data/analysis_cache.db"
+
+# Target schemas (timestamp INTEGER) and the pass-through columns,
+# keyed by table name; {name} lets the rebuild create a scratch table
+SCHEMAS = {
+    "market_cap_history": """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            market_cap INTEGER NOT NULL,
+            timestamp INTEGER NOT NULL,
+            UNIQUE(symbol, timestamp)
+        )
+    """,
+    "fused_snapshots": """
+        CREATE TABLE {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            price REAL,
+            volume INTEGER,
+            market_cap INTEGER,
+            timestamp INTEGER NOT NULL,
+            UNIQUE(symbol, timestamp)
+        )
+    """,
+}
+
+COLUMNS = {
+    "market_cap_history": ["id", "symbol", "market_cap"],
+    "fused_snapshots": ["id", "symbol", "price", "volume", "market_cap"],
+}
+
+
+def to_epoch(value):
+    """Convert a timestamp value to epoch seconds.
+
+    Handles epoch ints, epoch digits stored as text (the result of a
+    TEXT-affinity column coercing an int write), and ISO-8601 strings.
+    """
+    if isinstance(value, int):
+        return value
+    value = str(value)
+    if value.isdigit():
+        return int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _needs_rebuild(cursor, table):
+    """True if the timestamp column is not INTEGER-declared or holds text"""
+    cursor.execute(f"SELECT type FROM pragma_table_info('{table}') WHERE name = 'timestamp'")
+    row = cursor.fetchone()
+    if row and row[0].upper() != "INTEGER":
+        return True
+    cursor.execute(f"SELECT 1 FROM {table} WHERE typeof(timestamp) = 'text' LIMIT 1")
+    return cursor.fetchone() is not None
+
+
+def migrate():
+    """Rebuild tables whose timestamp column still has TEXT affinity"""
+
+    if not os.path.exists(DB_PATH):
+        print(f"✅ Database not found at {DB_PATH} - nothing to migrate")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    for table, schema in SCHEMAS.items():
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name=?
+        """, (table,))
+
+        if not cursor.fetchone():
+            print(f"✅ Table {table} not found - skipping")
+            continue
+
+        if not _needs_rebuild(cursor, table):
+            print(f"✅ {table}: timestamps already INTEGER - nothing to do")
+            continue
+
+        print(f"🔧 {table}: rebuilding with INTEGER timestamps...")
+
+        cols = COLUMNS[table]
+        scratch = f"{table}_migrated"
+        placeholders = ", ".join("?" for _ in range(len(cols) + 1))
+
+        cursor.execute(f"DROP TABLE IF EXISTS {scratch}")
+        cursor.execute(schema.format(name=scratch))
+
+        cursor.execute(f"SELECT {', '.join(cols)}, timestamp FROM {table}")
+        rows = cursor.fetchall()
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {scratch} ({', '.join(cols)}, timestamp) VALUES ({placeholders})",
+            [(*row[:-1], to_epoch(row[-1])) for row in rows]
+        )
+
+        # Swap the rebuilt table in; its indexes are recreated by init_db
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {scratch} RENAME TO {table}")
+        conn.commit()
+        print(f"✅ {table}: converted {len(rows)} rows")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  Epoch Timestamp Migration")
+    print("=" * 60)
+    print()
+
+    migrate()
+
+    print()
+    print("=" * 60)
+    print("  Migration Complete")
+    print("=" * 60)
+    print()
+    print("Next steps:")
+    print("1. Restart the analysis-service container")
+    print("2. Verify /marketcap/history/{symbol} returns data as before")
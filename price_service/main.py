@@ -76,36 +76,75 @@ def init_db():
     print("Database initialized")
 
 
+# Long-lived writer connection - sqlite3 caches prepared statements per
+# connection, so reusing one connection/cursor avoids re-parsing the SQL
+# on every insert. Guarded by a lock since writers run on several threads.
+INSERT_CANDLE_SQL = """
+    INSERT OR REPLACE INTO price_candles
+    (symbol, timestamp_utc, timestamp_local, open, high, low, close,
+     volume, interval, source, stale, asof)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_WRITE_LOCK = threading.Lock()
+_WRITE_CONN = None
+_WRITE_CURSOR = None
+
+
+def _get_write_cursor():
+    """Lazily open the shared writer connection (after init_db has run)"""
+    global _WRITE_CONN, _WRITE_CURSOR
+    if _WRITE_CURSOR is None:
+        _WRITE_CONN = sqlite3.connect(DB_PATH, cached_statements=256, check_same_thread=False)
+        _WRITE_CURSOR = _WRITE_CONN.cursor()
+    return _WRITE_CURSOR
+
+
+def _candle_row(candle):
+    return (
+        candle["symbol"],
+        candle["timestamp_utc"],
+        candle["timestamp_local"],
+        candle["open"],
+        candle["high"],
+        candle["low"],
+        candle["close"],
+        candle["volume"],
+        candle["interval"],
+        candle["source"],
+        1 if candle.get("stale") else 0,
+        candle["asof"]
+    )
+
+
 def save_candle_to_db(candle):
     """Save a candle to database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO price_candles 
-            (symbol, timestamp_utc, timestamp_local, open, high, low, close, 
-             volume, interval, source, stale, asof)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            candle["symbol"],
-            candle["timestamp_utc"],
-            candle["timestamp_local"],
-            candle["open"],
-            candle["high"],
-            candle["low"],
-            candle["close"],
-            candle["volume"],
-            candle["interval"],
-            candle["source"],
-            1 if candle.get("stale") else 0,
-            candle["asof"]
-        ))
-        conn.commit()
-    except Exception as e:
-        print(f"Error saving to DB: {e}")
-    finally:
-        conn.close()
+    save_candles_to_db([candle])
+
+
+def save_candles_to_db(candles):
+    """Save a batch of candles in a single executemany round-trip"""
+    global _WRITE_CONN, _WRITE_CURSOR
+    if not candles:
+        return
+    rows = [_candle_row(c) for c in candles]
+    with _WRITE_LOCK:
+        try:
+            cursor = _get_write_cursor()
+            cursor.executemany(INSERT_CANDLE_SQL, rows)
+            _WRITE_CONN.commit()
+        except Exception as e:
+            print(f"Error saving to DB: {e}")
+            # Undo whatever the failed batch did insert, so those rows
+            # can't ride along with the next successful commit
+            try:
+                _WRITE_CONN.rollback()
+            except Exception:
+                # Connection-level failure (disk full, malformed DB) -
+                # drop the cached handles so the lazy opener rebuilds
+                # them on the next save
+                _WRITE_CONN = None
+                _WRITE_CURSOR = None
 
 
 def load_candles_for_day(symbol: str, target_day: dt_date):
@@ -155,18 +194,14 @@ def load_candles_for_day(symbol: str, target_day: dt_date):
 # ---------------------------------------------------------
 def get_market_status():
     now_ct = datetime.now(CENTRAL_TZ)
-    weekday = now_ct.weekday()
-
-    if weekday >= 5:
-        return "closed"
-
-    market_open = now_ct.replace(hour=8, minute=0, second=0, microsecond=0)
-    market_close = now_ct.replace(hour=15, minute=30, second=0, microsecond=0)
 
-    if now_ct < market_open or now_ct >= market_close:
+    if now_ct.weekday() >= 5:
         return "closed"
 
-    return "open"
+    # Compare minutes-since-midnight against 8:00 (480) and 15:30 (930)
+    # instead of allocating two datetimes via .replace() per call
+    minute_of_day = now_ct.hour * 60 + now_ct.minute
+    return "open" if 480 <= minute_of_day < 930 else "closed"
 
 
 # ---------------------------------------------------------
@@ -192,50 +227,54 @@ def backfill_day(symbol: str, target_day: dt_date):
         if data.empty:
             print(f"[{symbol}] No data returned for {target_day}")
             return 0
-        
-        count = 0
-        for idx, row in data.iterrows():
-            ts_utc = idx.to_pydatetime()
-            if ts_utc.tzinfo is None:
-                ts_utc = ts_utc.replace(tzinfo=timezone.utc)
-            else:
-                ts_utc = ts_utc.astimezone(timezone.utc)
-            ts_ct = ts_utc.astimezone(CENTRAL_TZ)
-            
-            # Only include candles that fall on the target day in Central Time
-            if ts_ct.date() != target_day:
-                continue
-            
-            o = float(row["Open"])
-            h = float(row["High"])
-            l = float(row["Low"])
-            c = float(row["Close"])
-            v = int(row["Volume"])
-            
-            # Skip placeholder candles
-            if v == 0 and o == h == l == c:
-                continue
-            
-            candle = {
+
+        # Normalize the whole frame with vectorized column ops instead of
+        # iterrows() - per-row Series construction dominates for long days
+        idx_utc = data.index
+        if idx_utc.tz is None:
+            idx_utc = idx_utc.tz_localize(timezone.utc)
+        else:
+            idx_utc = idx_utc.tz_convert(timezone.utc)
+        idx_ct = idx_utc.tz_convert(CENTRAL_TZ)
+
+        opens = data["Open"].round(2).to_numpy()
+        highs = data["High"].round(2).to_numpy()
+        lows = data["Low"].round(2).to_numpy()
+        closes = data["Close"].round(2).to_numpy()
+        volumes = data["Volume"].to_numpy()
+
+        # Only include candles that fall on the target day in Central Time,
+        # and skip zero-volume placeholder candles
+        on_target_day = idx_ct.date == target_day
+        placeholder = (volumes == 0) & (opens == highs) & (highs == lows) & (lows == closes)
+        keep = on_target_day & ~placeholder
+
+        asof = datetime.now(timezone.utc).isoformat()
+        candles = [
+            {
                 "symbol": symbol,
                 "interval": INTERVAL,
                 "timestamp_local": ts_ct.isoformat(),
                 "timestamp_utc": ts_utc.isoformat(),
-                "asof": datetime.now(timezone.utc).isoformat(),
-                "open": round(o, 2),
-                "high": round(h, 2),
-                "low": round(l, 2),
-                "close": round(c, 2),
-                "volume": v,
+                "asof": asof,
+                "open": float(o),
+                "high": float(h),
+                "low": float(l),
+                "close": float(c),
+                "volume": int(v),
                 "source": "yfinance_backfill",
                 "stale": False,
             }
-            
-            save_candle_to_db(candle)
-            count += 1
-        
-        print(f"[{symbol}] Backfilled {count} candles for {target_day}")
-        return count
+            for ts_utc, ts_ct, o, h, l, c, v in zip(
+                idx_utc[keep], idx_ct[keep],
+                opens[keep], highs[keep], lows[keep], closes[keep], volumes[keep]
+            )
+        ]
+
+        save_candles_to_db(candles)
+
+        print(f"[{symbol}] Backfilled {len(candles)} candles for {target_day}")
+        return len(candles)
         
     except Exception as e:
         print(f"[{symbol}] Backfill error for {target_day}: {e}")
@@ -578,18 +617,30 @@ def health_check():
     }
 
 
+def _project_candles(candles, fields):
+    """Trim candle dicts to a comma-separated field list (None = all).
+
+    Candles carry 12 keys but most clients chart only a handful, so
+    projection cuts the JSON payload roughly in half for them.
+    """
+    if not fields:
+        return candles
+    keys = [k.strip() for k in fields.split(",") if k.strip()]
+    return [{k: candle[k] for k in keys if k in candle} for candle in candles]
+
+
 @app.get("/prices")
-def get_all_prices():
+def get_all_prices(fields: str = None):
     """Get today's and previous day's data for all symbols"""
     today = get_ct_today()
     previous = get_previous_trading_day(today)
-    
+
     data = []
     for sym in DEFAULT_TICKERS:
         # Reload from DB to ensure freshness
-        today_candles = load_candles_for_day(sym, today)
-        prev_candles = load_candles_for_day(sym, previous)
-        
+        today_candles = _project_candles(load_candles_for_day(sym, today), fields)
+        prev_candles = _project_candles(load_candles_for_day(sym, previous), fields)
+
         payload = {
             "symbol": sym,
             "current_day": {
@@ -614,17 +665,17 @@ def get_all_prices():
 
 
 @app.get("/prices/{symbol}")
-def get_price(symbol: str):
+def get_price(symbol: str, fields: str = None):
     """Get today's and previous day's data for a specific symbol"""
     symbol = symbol.upper()
-    
+
     today = get_ct_today()
     previous = get_previous_trading_day(today)
-    
+
     # Load fresh data from database
-    today_candles = load_candles_for_day(symbol, today)
-    prev_candles = load_candles_for_day(symbol, previous)
-    
+    today_candles = _project_candles(load_candles_for_day(symbol, today), fields)
+    prev_candles = _project_candles(load_candles_for_day(symbol, previous), fields)
+
     if not today_candles and not prev_candles:
         raise HTTPException(status_code=404, detail=f"No data available for symbol {symbol}")
 
@@ -1,6 +1,7 @@
 import requests
 import os
 import sqlite3
+import time
 from datetime import datetime, timezone
 
 # Service URLs
@@ -10,6 +11,27 @@ FUNDAMENTAL_SERVICE_URL = os.getenv("FUNDAMENTAL_SERVICE_URL", "http://fundament
 # Database path
 DB_PATH = "/app/data/analysis_cache.db"
 
+# Module-level session so upstream calls reuse keep-alive connections
+# instead of paying TCP setup per request
+SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Tracked tickers (same env convention as the price service)
+DEFAULT_TICKERS = [t.strip() for t in os.getenv("TICKERS", "AAPL, AMZN, META, NVDA, TSLA").split(",")]
+
+# Pre-generated INSERT statements with the symbol baked in, one per tracked
+# ticker - saves re-binding the symbol parameter on every snapshot write.
+# Safe because symbols come from the fixed env-configured list, not user input.
+_FUSED_WRITE_STMTS = {
+    sym: (
+        "INSERT OR REPLACE INTO fused_snapshots "
+        f"(symbol, price, volume, market_cap, timestamp) VALUES ('{sym}', ?, ?, ?, ?)"
+    )
+    for sym in DEFAULT_TICKERS
+}
+
 
 # ---------------------------------------------------------
 # Database Setup
@@ -21,17 +43,18 @@ def init_db():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
-    # Table for market cap
+    # Table for market cap - timestamp is unix epoch seconds (INTEGER), so
+    # index comparisons are integer compares instead of strcmp on ISO text
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS market_cap_history (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             symbol TEXT NOT NULL,
             market_cap INTEGER NOT NULL,
-            timestamp TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
             UNIQUE(symbol, timestamp)
         )
     """)
-    
+
     # Table for fused data snapshots
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS fused_snapshots (
@@ -40,13 +63,17 @@ def init_db():
             price REAL,
             volume INTEGER,
             market_cap INTEGER,
-            timestamp TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
             UNIQUE(symbol, timestamp)
         )
     """)
     
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_mcap_symbol ON market_cap_history(symbol, timestamp DESC)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_fused_symbol ON fused_snapshots(symbol, timestamp DESC)")
+
+    # Covering indexes so history reads are index-only scans (no heap fetch per row)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_mcap_cover ON market_cap_history(symbol, timestamp DESC, market_cap)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fused_cover ON fused_snapshots(symbol, timestamp DESC, price, volume, market_cap)")
     
     conn.commit()
     conn.close()
@@ -54,13 +81,13 @@ def init_db():
 
 
 def save_market_cap_to_db(symbol, market_cap, timestamp=None):
-    """Save market cap to database"""
+    """Save market cap to database (timestamp is unix epoch seconds)"""
     if market_cap is None:
         return
-    
+
     if timestamp is None:
-        timestamp = datetime.now(timezone.utc).isoformat()
-    
+        timestamp = int(time.time())
+
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
@@ -77,19 +104,24 @@ def save_market_cap_to_db(symbol, market_cap, timestamp=None):
 
 
 def save_fused_snapshot(symbol, price, volume, market_cap, timestamp=None):
-    """Save complete fused data snapshot"""
+    """Save complete fused data snapshot (timestamp is unix epoch seconds)"""
     if timestamp is None:
-        timestamp = datetime.now(timezone.utc).isoformat()
-    
+        timestamp = int(time.time())
+
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    
+
     try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO fused_snapshots 
-            (symbol, price, volume, market_cap, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        """, (symbol, price, volume, market_cap, timestamp))
+        stmt = _FUSED_WRITE_STMTS.get(symbol)
+        if stmt is not None:
+            cursor.execute(stmt, (price, volume, market_cap, timestamp))
+        else:
+            # Untracked symbol - fall back to the generic parameterized insert
+            cursor.execute("""
+                INSERT OR REPLACE INTO fused_snapshots
+                (symbol, price, volume, market_cap, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            """, (symbol, price, volume, market_cap, timestamp))
         conn.commit()
     except Exception as e:
         print(f"Error saving fused snapshot: {e}")
@@ -103,17 +135,28 @@ def get_market_cap_history(symbol, limit=100):
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT market_cap, timestamp
-        FROM market_cap_history
-        WHERE symbol = ?
-        ORDER BY timestamp DESC
-        LIMIT ?
+        SELECT market_cap, timestamp FROM (
+            SELECT market_cap, timestamp
+            FROM market_cap_history
+            WHERE symbol = ?
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ) ORDER BY timestamp ASC
     """, (symbol, limit))
-    
+
     rows = cursor.fetchall()
     conn.close()
-    
-    return [{"market_cap": row[0], "timestamp": row[1]} for row in reversed(rows)]
+
+    # Convert epoch seconds back to ISO-8601 only at the JSON boundary.
+    # int() tolerates epoch digits a legacy TEXT-affinity column stored
+    # as text (e.g. when the migration has not run yet).
+    return [
+        {
+            "market_cap": row[0],
+            "timestamp": datetime.fromtimestamp(int(row[1]), timezone.utc).isoformat()
+        }
+        for row in rows
+    ]
 
 
 def get_fused_history(symbol, limit=100):
@@ -122,22 +165,24 @@ def get_fused_history(symbol, limit=100):
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT price, volume, market_cap, timestamp
-        FROM fused_snapshots
-        WHERE symbol = ?
-        ORDER BY timestamp DESC
-        LIMIT ?
+        SELECT price, volume, market_cap, timestamp FROM (
+            SELECT price, volume, market_cap, timestamp
+            FROM fused_snapshots
+            WHERE symbol = ?
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ) ORDER BY timestamp ASC
     """, (symbol, limit))
-    
+
     rows = cursor.fetchall()
     conn.close()
-    
+
     return [{
         "price": row[0],
         "volume": row[1],
         "market_cap": row[2],
-        "timestamp": row[3]
-    } for row in reversed(rows)]
+        "timestamp": datetime.fromtimestamp(int(row[3]), timezone.utc).isoformat()
+    } for row in rows]
 
 
 # Initialize database on import
@@ -153,11 +198,11 @@ def get_fused_data(symbol: str):
     price_data = {}
     market_cap = None
     errors = []
-    timestamp = datetime.now(timezone.utc).isoformat()
+    timestamp = int(time.time())
 
     # 1. Latest price
     try:
-        price_resp = requests.get(f"{PRICE_SERVICE_URL}/{symbol}", timeout=5)
+        price_resp = SESSION.get(f"{PRICE_SERVICE_URL}/{symbol}", timeout=5)
         if price_resp.status_code == 200:
             price_data = price_resp.json()
         else:
@@ -168,7 +213,7 @@ def get_fused_data(symbol: str):
 
     # 2. Market Cap
     try:
-        fund_resp = requests.get(f"{FUNDAMENTAL_SERVICE_URL}/{symbol}", timeout=5)
+        fund_resp = SESSION.get(f"{FUNDAMENTAL_SERVICE_URL}/{symbol}", timeout=5)
         if fund_resp.status_code == 200:
             market_cap = fund_resp.json().get("market_cap")
             # Save to database